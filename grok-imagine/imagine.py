@@ -27,43 +27,76 @@ Usage:
     
     # All options together
     python imagine.py "A cat in space" --count 3 --output ./my_images
+    
+    # Generate new images even if this prompt was run before
+    python imagine.py "A cat in space" --no-cache
 """
 
 import os
 import sys
 import argparse
-import requests
+import importlib.util
+import hashlib
 import json
+import shutil
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from io import BytesIO
 from pathlib import Path
 from datetime import datetime
-from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
 
-# Try to load environment variables from .env file
-try:
-    from dotenv import load_dotenv
-    # Load from .env in current directory or parent directories
-    load_dotenv()
-    # Also try loading from the script's directory
-    load_dotenv(Path(__file__).parent / '.env')
-    # Try parent directory too
-    load_dotenv(Path(__file__).parent.parent / '.env')
-except ImportError:
-    # python-dotenv not installed, will fall back to environment variables only
-    pass
+# Try to load environment variables from .env file, unless the key is
+# already set in the environment
+if not os.getenv("XAI_API_KEY"):
+    try:
+        from dotenv import load_dotenv
+        # Load from the script's directory, then its parent directory,
+        # using explicit paths to avoid walking up from the current directory
+        for env_file in (Path(__file__).parent / '.env',
+                         Path(__file__).parent.parent / '.env'):
+            load_dotenv(env_file)
+            if os.getenv("XAI_API_KEY"):
+                break
+    except ImportError:
+        # python-dotenv not installed, will fall back to environment variables only
+        pass
 
-# Try to import PIL for image processing (optional)
+# Check for PIL for image processing (optional). It is only imported when an
+# image actually needs converting, which keeps startup fast.
+PIL_SUPPORT = importlib.util.find_spec("PIL") is not None
+
+# Try to import orjson for faster JSON encoding (optional)
 try:
-    from PIL import Image
-    from io import BytesIO
-    PIL_SUPPORT = True
+    import orjson
 except ImportError:
-    PIL_SUPPORT = False
+    orjson = None
+
+# Read and write downloads in 1 MiB blocks to keep per-chunk overhead low
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# Images up to this size are downloaded into memory; larger ones are streamed
+# to disk in DOWNLOAD_CHUNK_SIZE blocks
+IN_MEMORY_MAX_SIZE = 20 << 20
+
+# Translation table for sanitize_filename: keep ASCII letters, digits, spaces,
+# dashes and underscores, replace path/shell-unsafe characters with '_' and
+# drop all other ASCII characters
+_FILENAME_TRANSLATION = str.maketrans({
+    chr(code): (
+        chr(code) if chr(code).isalnum() or chr(code) in ' -_'
+        else '_' if chr(code) in '/\\:*?"<>|'
+        else None
+    )
+    for code in range(128)
+})
 
 
 class XAIImageAPI:
     """Wrapper for X.AI Image Generation API operations"""
     
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, use_cache=True):
         self.api_key = api_key or os.getenv("XAI_API_KEY")
         if not self.api_key:
             raise ValueError(
@@ -74,10 +107,36 @@ class XAIImageAPI:
             )
         
         self.base_url = "https://api.x.ai/v1"
+        self.model = "grok-2-image"  # Aurora image generation model
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        
+        # Cache generation responses and downloaded images on disk so that
+        # repeating an identical request is free and instant
+        self.cache_dir = Path(os.getenv(
+            "XAI_CACHE_DIR", Path.home() / ".cache" / "xai-imagine"
+        ))
+        self.use_cache = use_cache and not os.getenv("XAI_NO_CACHE")
+        self.last_response_cached = False
+        
+        # Share one connection pool between the API and image downloads so
+        # repeated requests reuse TCP/TLS connections instead of reconnecting.
+        # The auth headers are sent per request and never to the image host.
+        # Once retries run out the last response is returned, so
+        # raise_for_status() still raises an HTTPError that carries it.
+        retries = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False
+        )
+        self.session = requests.Session()
+        self.session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retries)
+        )
     
     def generate_image(self, prompt, n=1, size=None, response_format="url"):
         """
@@ -94,8 +153,18 @@ class XAIImageAPI:
         """
         url = f"{self.base_url}/images/generations"
         
+        # Return the stored response if this exact request was made before
+        cache_key = self._cache_key(self.model, n, response_format, prompt)
+        cache_file = self.cache_dir / f"{cache_key}.json"
+        self.last_response_cached = False
+        if self.use_cache:
+            cached = self._load_cached_response(cache_file)
+            if cached is not None:
+                self.last_response_cached = True
+                return cached
+        
         payload = {
-            "model": "grok-2-image",  # Aurora image generation model
+            "model": self.model,
             "prompt": prompt,
             "n": n,
             "response_format": response_format
@@ -105,46 +174,130 @@ class XAIImageAPI:
         # Images are generated at the default size: 1024x768
         # Pricing: $0.07 per image
         
-        response = requests.post(
+        # Encode the body ourselves; self.headers already sets the JSON content type
+        body = orjson.dumps(payload) if orjson else json.dumps(payload).encode()
+        
+        response = self.session.post(
             url,
             headers=self.headers,
-            json=payload
+            data=body
         )
         
         response.raise_for_status()
-        return response.json()
+        result = response.json()
+        
+        if self.use_cache:
+            # Write to a partial file first so an interrupted run never
+            # leaves a truncated response in the cache
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                partial_file = cache_file.with_suffix('.json.part')
+                with open(partial_file, 'w') as f:
+                    json.dump(result, f)
+                os.replace(partial_file, cache_file)
+            except OSError:
+                # Caching is best effort; the generated images are still returned
+                pass
+        
+        return result
     
-    def download_image(self, image_url, output_path):
+    def _load_cached_response(self, cache_file):
         """
-        Download an image from a URL and save it to disk
+        Load a stored API response if it can still be used
+        
+        Image URLs returned by the API expire, so a response is only reused
+        once every image it references is in the image cache. An unreadable
+        cache file is treated as a cache miss.
+        
+        Args:
+            cache_file (Path): Location of the stored response
+        
+        Returns:
+            dict: The stored response, or None if it cannot be reused
+        """
+        try:
+            with open(cache_file) as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        for image_data in result.get('data', []):
+            image_url = image_data.get('url')
+            if image_url and not self.cached_image_path(image_url).exists():
+                return None
+        
+        return result
+    
+    def cached_image_path(self, image_url):
+        """
+        Get the cache location for a downloaded image
+        
+        Args:
+            image_url (str): URL of the image
+        
+        Returns:
+            Path: Path of the cached image, or None if caching is disabled
+        """
+        if not self.use_cache:
+            return None
+        return self.cache_dir / "images" / f"{self._cache_key(image_url)}.jpg"
+    
+    @staticmethod
+    def _cache_key(*parts):
+        """Build a stable cache key from the given request parts"""
+        return hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()
+    
+    def download_image(self, image_url, output_path=None, spill_path=None):
+        """
+        Download an image from a URL, either to disk or into memory
         
         Args:
             image_url (str): URL of the image to download
-            output_path (str): Path where to save the image
+            output_path (str): Path where to save the image. If omitted, the
+                               image is returned as bytes instead
+            spill_path (str): Used when output_path is omitted. Images whose
+                              Content-Length exceeds IN_MEMORY_MAX_SIZE are
+                              streamed to this path instead of into memory
         
         Returns:
-            str: Path to the saved image
+            tuple: Path to the saved image (or the image bytes when it was
+                   downloaded into memory) and the response's media type
+                   (e.g. "image/jpeg")
         """
-        response = requests.get(image_url, stream=True)
+        response = self.session.get(image_url, stream=True)
         response.raise_for_status()
         
+        content_type = response.headers.get('Content-Type', '')
+        media_type = content_type.split(';', 1)[0].strip().lower()
+        
+        if output_path is None:
+            try:
+                size = int(response.headers.get('Content-Length', 0))
+            except ValueError:
+                size = 0
+            if spill_path is None or size <= IN_MEMORY_MAX_SIZE:
+                return response.content, media_type
+            output_path = spill_path
+        
         # Ensure output directory exists
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
         # Save the image
-        with open(output_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
+        with open(output_path, 'wb', buffering=DOWNLOAD_CHUNK_SIZE) as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                 f.write(chunk)
         
-        return str(output_path)
+        return str(output_path), media_type
     
-    def convert_to_jpeg(self, image_path):
+    def convert_to_jpeg(self, image_path, output_path=None):
         """
         Convert an image to JPEG format if it's not already
         
         Args:
             image_path (str): Path to the image file
+            output_path (str): Path where to save the JPEG image (default:
+                               image_path with a .jpg suffix)
         
         Returns:
             str: Path to the JPEG image
@@ -153,31 +306,65 @@ class XAIImageAPI:
             print("⚠ Pillow not installed. Cannot convert to JPEG.")
             return image_path
         
+        from PIL import Image
+        
         image_path = Path(image_path)
         
         # If already JPEG, return as is
-        if image_path.suffix.lower() in ['.jpg', '.jpeg']:
+        if output_path is None and image_path.suffix.lower() in ['.jpg', '.jpeg']:
             return str(image_path)
         
         # Open and convert to JPEG
         with Image.open(image_path) as img:
-            # Convert RGBA to RGB if necessary
-            if img.mode in ('RGBA', 'LA', 'P'):
-                rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                rgb_img.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-                img = rgb_img
-            
-            # Save as JPEG
-            jpeg_path = image_path.with_suffix('.jpg')
-            img.save(jpeg_path, 'JPEG', quality=95)
+            jpeg_path = Path(output_path) if output_path else image_path.with_suffix('.jpg')
+            self._to_rgb(img).save(jpeg_path, 'JPEG', quality=95)
         
         # Remove original if different
         if jpeg_path != image_path:
             image_path.unlink()
         
         return str(jpeg_path)
+    
+    def convert_bytes_to_jpeg(self, image_bytes, output_path):
+        """
+        Convert in-memory image data to a JPEG file
+        
+        Args:
+            image_bytes (bytes): Encoded image data (PNG, WebP, ...)
+            output_path (str): Path where to save the JPEG image
+        
+        Returns:
+            str: Path to the saved image
+        """
+        output_path = Path(output_path)
+        
+        if not PIL_SUPPORT:
+            print("⚠ Pillow not installed. Cannot convert to JPEG.")
+            output_path.write_bytes(image_bytes)
+            return str(output_path)
+        
+        from PIL import Image
+        
+        # Decode from memory and write the JPEG in a single pass
+        with Image.open(BytesIO(image_bytes)) as img:
+            self._to_rgb(img).save(output_path, 'JPEG', quality=95)
+        
+        return str(output_path)
+    
+    @staticmethod
+    def _to_rgb(img):
+        """Flatten images with transparency or a palette onto a white background"""
+        from PIL import Image
+        
+        # Convert RGBA to RGB if necessary
+        if img.mode in ('RGBA', 'LA', 'P'):
+            rgb_img = Image.new('RGB', img.size, (255, 255, 255))
+            if img.mode == 'P':
+                img = img.convert('RGBA')
+            rgb_img.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
+            img = rgb_img
+        
+        return img
 
 
 def sanitize_filename(text, max_length=50):
@@ -192,14 +379,79 @@ def sanitize_filename(text, max_length=50):
         str: Sanitized filename
     """
     # Remove or replace unsafe characters
-    safe_chars = []
-    for char in text[:max_length]:
-        if char.isalnum() or char in (' ', '-', '_'):
-            safe_chars.append(char)
-        elif char in ('/\\', ':', '*', '?', '"', '<', '>', '|'):
-            safe_chars.append('_')
-    
-    return ''.join(safe_chars).strip().replace(' ', '_')
+    safe_text = text[:max_length].translate(_FILENAME_TRANSLATION)
+    
+    # Non-ASCII letters and digits are kept, anything else is dropped
+    if not safe_text.isascii():
+        safe_text = ''.join(c for c in safe_text if c.isascii() or c.isalnum())
+    
+    return safe_text.strip().replace(' ', '_')
+
+
+def save_image(api, image_url, output_path):
+    """
+    Download a generated image and store it as a JPEG file
+    
+    Args:
+        api (XAIImageAPI): API client used for the download
+        image_url (str): URL of the generated image
+        output_path (Path): Final path of the JPEG file
+    
+    Returns:
+        Path: Path to the saved image
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    # Reuse an earlier download of the same image if it is cached
+    cached_path = api.cached_image_path(image_url)
+    if cached_path and cached_path.exists():
+        _copy_atomically(cached_path, output_path)
+        return output_path
+    
+    _download_as_jpeg(api, image_url, output_path)
+    
+    if cached_path:
+        try:
+            cached_path.parent.mkdir(parents=True, exist_ok=True)
+            _copy_atomically(output_path, cached_path)
+        except OSError:
+            # Caching is best effort; the image itself was saved
+            pass
+    
+    return output_path
+
+
+def _download_as_jpeg(api, image_url, output_path):
+    """Download an image to output_path, converting it to JPEG if needed"""
+    # Write to a partial file first so output_path only ever holds a
+    # complete image, even with several downloads running at once
+    partial_path = output_path.with_suffix('.jpg.part')
+    
+    # Download into memory; generated images are small enough that this
+    # avoids writing a temporary file and reading it back for conversion.
+    # Unusually large images are streamed to a raw file on disk instead.
+    raw_path = output_path.with_suffix('.download.part')
+    image, media_type = api.download_image(image_url, spill_path=raw_path)
+    
+    # The image host usually serves JPEG already, so no conversion is needed
+    if isinstance(image, bytes):
+        if media_type == 'image/jpeg':
+            partial_path.write_bytes(image)
+        else:
+            api.convert_bytes_to_jpeg(image, partial_path)
+    elif media_type == 'image/jpeg':
+        partial_path = raw_path
+    else:
+        partial_path = api.convert_to_jpeg(raw_path, partial_path)
+    
+    os.replace(partial_path, output_path)
+
+
+def _copy_atomically(source, destination):
+    """Copy a file so that the destination never appears half-written"""
+    partial_path = destination.with_suffix('.jpg.part')
+    shutil.copyfile(source, partial_path)
+    os.replace(partial_path, destination)
 
 
 def print_section(title):
@@ -245,6 +497,12 @@ Examples:
         help='Image size in WIDTHxHEIGHT format (e.g., 1024x1024, 2048x2048, 1792x1024). Common: 256x256, 512x512, 1024x1024, 2048x2048, 1792x1024. Default: 1024x1024'
     )
     
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always call the API instead of reusing cached results for an identical prompt'
+    )
+    
     parser.add_argument(
         'prompt',
         nargs='?',
@@ -269,7 +527,7 @@ Examples:
             print(f"✓ Found XAI_API_KEY in environment: {key_preview}")
         
         # Initialize the API client
-        api = XAIImageAPI()
+        api = XAIImageAPI(use_cache=not args.no_cache)
         print("✓ API client initialized successfully")
         
         # Display generation parameters
@@ -291,6 +549,10 @@ Examples:
             response_format="url"
         )
         
+        if api.last_response_cached:
+            print("✓ Using cached result for this prompt (no API call made)")
+            print("   Run with --no-cache to generate new images")
+        
         print(f"✓ Successfully generated {len(response.get('data', []))} image(s)!")
         
         # Download and save images
@@ -301,6 +563,7 @@ Examples:
         prompt_slug = sanitize_filename(args.prompt, max_length=30)
         
         saved_files = []
+        downloads = []
         
         for idx, image_data in enumerate(response.get('data', []), 1):
             image_url = image_data.get('url')
@@ -315,34 +578,32 @@ Examples:
             else:
                 filename = f"{prompt_slug}_{timestamp}_{idx}.jpg"
             
-            output_path = Path(args.output) / filename
+            downloads.append((idx, image_url, Path(args.output) / filename))
+        
+        if downloads:
+            print(f"⏳ Downloading {len(downloads)} image(s) concurrently...")
             
-            try:
-                print(f"⏳ Downloading image {idx}/{args.count}...")
-                
-                # Download the image
-                temp_path = api.download_image(image_url, output_path.with_suffix('.tmp'))
-                
-                # Convert to JPEG
-                final_path = api.convert_to_jpeg(temp_path)
-                
-                # Rename to final name
-                final_path = Path(final_path)
-                if final_path.name != filename:
-                    final_output = output_path
-                    final_path.rename(final_output)
-                    final_path = final_output
-                
-                saved_files.append(str(final_path))
-                
-                # Get file size
-                file_size = final_path.stat().st_size
-                size_kb = file_size / 1024
-                
-                print(f"✓ Saved: {final_path.name} ({size_kb:.1f} KB)")
+            # Downloads are network-bound, so fetch all images in parallel
+            # and report the results in their original order
+            with ThreadPoolExecutor(max_workers=len(downloads)) as executor:
+                futures = [
+                    executor.submit(save_image, api, image_url, output_path)
+                    for _, image_url, output_path in downloads
+                ]
                 
-            except Exception as e:
-                print(f"✗ Failed to download image {idx}: {str(e)}")
+                for (idx, _, _), future in zip(downloads, futures):
+                    try:
+                        final_path = future.result()
+                        saved_files.append(str(final_path))
+                        
+                        # Get file size
+                        file_size = final_path.stat().st_size
+                        size_kb = file_size / 1024
+                        
+                        print(f"✓ Saved image {idx}/{args.count}: {final_path.name} ({size_kb:.1f} KB)")
+                        
+                    except Exception as e:
+                        print(f"✗ Failed to download image {idx}: {str(e)}")
         
         # Summary
         print_section("Summary")
@@ -30,14 +30,28 @@ Usage:
     # More examples
     python files_api_query_demo.py report.pdf "List all action items"
     python files_api_query_demo.py ~/Documents/ "Find security concerns"
+    
+    # Delete all uploaded files at the end without prompting
+    python files_api_query_demo.py path/to/folder/ --delete-all
 """
 
 import os
 import sys
+import mmap
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import codecs
+import hashlib
+import tempfile
+import shutil
 from pathlib import Path
 from io import BytesIO
+from email.message import Message
+from functools import lru_cache
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
 
 # Try to load environment variables from .env file
 try:
@@ -50,12 +64,99 @@ except ImportError:
     # python-dotenv not installed, will fall back to environment variables only
     pass
 
-# Try to import PDF library (optional)
+# Try to import orjson for faster JSON encoding/decoding (optional)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Try to import requests_toolbelt for streaming multipart uploads (optional)
 try:
-    from PyPDF2 import PdfReader
-    PDF_SUPPORT = True
+    from requests_toolbelt import MultipartEncoder
+    STREAMING_UPLOAD_SUPPORT = True
 except ImportError:
-    PDF_SUPPORT = False
+    STREAMING_UPLOAD_SUPPORT = False
+
+
+def _env_positive_int(name, default):
+    """
+    Read a positive integer setting from the environment
+    
+    Args:
+        name: Name of the environment variable
+        default: Value used when the variable is unset or invalid
+    
+    Returns:
+        int: The configured value, or default
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        print(f"⚠ Ignoring {name}={value!r}; expected a positive integer. Using {default}.", file=sys.stderr)
+        return default
+    return number
+
+# Block size used when writing request bodies to the socket. urllib3's 16 KiB
+# default makes large uploads far slower than necessary on fast links.
+HTTP_BLOCKSIZE = 64 * 1024
+
+# Separator line used for section headers and around each file's content
+# in the chat prompt
+SEP = "=" * 60
+
+# Upper bound on the combined file text sent to the chat model. Content past
+# this limit is truncated so one oversized folder doesn't fail the request.
+MAX_CONTEXT_CHARS = _env_positive_int("XAI_MAX_CONTEXT_CHARS", 800000)
+
+# Downloaded files stay in memory up to this size and spill to disk beyond it
+SPOOL_MAX_SIZE = 8 << 20
+
+# Stored ETags and responses for conditional GET requests, kept across runs.
+# Each API key gets its own file, holding at most ETAG_CACHE_MAX_ENTRIES of
+# the most recently used responses
+ETAG_CACHE_DIR = Path.home() / ".cache" / "xai-files-etag"
+ETAG_CACHE_MAX_ENTRIES = 256
+
+# Content of the sample file uploaded when no path is given
+SAMPLE_BYTES = b"""Sample Data for X.AI Files API Demo
+            
+This is a sample text file containing information that can be used
+by the AI model during conversations.
+
+Key Facts:
+- The X.AI Files API allows uploading documents for context
+- Supported purposes include 'assistants' and 'fine-tune'
+- Files can be listed, retrieved, and deleted via the API
+- Files can be referenced in chat completions
+
+Example Use Cases:
+1. Providing context documents for specialized knowledge
+2. Uploading training data for fine-tuning
+3. Storing reference materials for long-term conversations
+"""
+
+# Maximum number of files uploaded in parallel
+MAX_CONCURRENT_UPLOADS = _env_positive_int("XAI_MAX_CONCURRENT_UPLOADS", 4)
+
+# Maximum number of files deleted in parallel
+MAX_CONCURRENT_DELETES = 8
+
+# Maximum number of file contents downloaded in parallel
+MAX_CONCURRENT_DOWNLOADS = _env_positive_int("XAI_MAX_CONCURRENT_DOWNLOADS", 8)
+
+
+class _BlockSizeAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections send bodies in HTTP_BLOCKSIZE chunks"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.setdefault("blocksize", HTTP_BLOCKSIZE)
+        super().init_poolmanager(*args, **kwargs)
 
 
 class XAIFilesAPI:
@@ -75,6 +176,40 @@ class XAIFilesAPI:
         self.headers = {
             "Authorization": f"Bearer {self.api_key}"
         }
+        self.json_headers = {**self.headers, "Content-Type": "application/json"}
+        
+        # Reuse one keep-alive connection pool for all API calls instead of
+        # paying a new TCP/TLS handshake per request. Once retries run out the
+        # last response is returned, so raise_for_status() still raises an
+        # HTTPError that carries it
+        retries = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False
+        )
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount(
+            "https://",
+            _BlockSizeAdapter(pool_connections=8, pool_maxsize=16, max_retries=retries)
+        )
+        
+        # URL -> (ETag, JSON response) for list_files/get_file, oldest first
+        key_hash = hashlib.sha256(self.api_key.encode()).hexdigest()[:16]
+        self._etag_cache_path = ETAG_CACHE_DIR / f"{key_hash}.json"
+        self._etag_cache = self._load_etag_cache()
+        self._etag_lock = Lock()
+    
+    def close(self):
+        """Close the underlying HTTP session"""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def upload_file(self, file_path, purpose="assistants"):
         """
@@ -90,22 +225,61 @@ class XAIFilesAPI:
         url = f"{self.base_url}/files"
         
         with open(file_path, 'rb') as f:
-            files = {
-                'file': (Path(file_path).name, f)
-            }
-            data = {
-                'purpose': purpose
-            }
-            
-            response = requests.post(
-                url,
-                headers=self.headers,
-                files=files,
-                data=data
-            )
+            if STREAMING_UPLOAD_SUPPORT:
+                # Stream the multipart body from the file instead of
+                # building the whole request in memory first
+                body = _map_file(f)
+                try:
+                    encoder = MultipartEncoder(fields={
+                        'purpose': purpose,
+                        'file': (Path(file_path).name, body)
+                    })
+                    response = self.session.post(
+                        url,
+                        headers={"Content-Type": encoder.content_type},
+                        data=encoder
+                    )
+                finally:
+                    if body is not f:
+                        body.close()
+            else:
+                files = {
+                    'file': (Path(file_path).name, f)
+                }
+                data = {
+                    'purpose': purpose
+                }
+                
+                response = self.session.post(
+                    url,
+                    files=files,
+                    data=data
+                )
             
         response.raise_for_status()
-        return response.json()
+        return _parse_json(response)
+    
+    def upload_files(self, file_paths, purpose="assistants", max_workers=None):
+        """
+        Upload several files concurrently
+        
+        Args:
+            file_paths: Paths of the files to upload
+            purpose: Purpose of the files (e.g., "assistants", "fine-tune")
+            max_workers: Maximum number of parallel uploads
+                         (default: XAI_MAX_CONCURRENT_UPLOADS or 4)
+        
+        Returns:
+            list: One entry per file, in the same order as file_paths: the
+                  upload response dict, or the exception raised for that file
+        """
+        with ThreadPoolExecutor(max_workers=max_workers or MAX_CONCURRENT_UPLOADS) as executor:
+            futures = [
+                executor.submit(self.upload_file, file_path, purpose)
+                for file_path in file_paths
+            ]
+        
+        return _collect_results(futures)
     
     def list_files(self):
         """
@@ -116,9 +290,7 @@ class XAIFilesAPI:
         """
         url = f"{self.base_url}/files"
         
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
+        return self._get_json_cached(url)
     
     def get_file(self, file_id):
         """
@@ -132,9 +304,7 @@ class XAIFilesAPI:
         """
         url = f"{self.base_url}/files/{file_id}"
         
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
+        return self._get_json_cached(url)
     
     def delete_file(self, file_id):
         """
@@ -148,9 +318,32 @@ class XAIFilesAPI:
         """
         url = f"{self.base_url}/files/{file_id}"
         
-        response = requests.delete(url, headers=self.headers)
+        response = self.session.delete(url)
         response.raise_for_status()
-        return response.json()
+        
+        # Forget the deleted file's cached metadata
+        with self._etag_lock:
+            if self._etag_cache.pop(url, None) is not None:
+                self._save_etag_cache()
+        
+        return _parse_json(response)
+    
+    def delete_many(self, file_ids, max_workers=None):
+        """
+        Delete several files concurrently
+        
+        Args:
+            file_ids: IDs of the files to delete
+            max_workers: Maximum number of parallel deletions (default: 8)
+        
+        Returns:
+            list: One entry per file, in the same order as file_ids: the
+                  deletion confirmation, or the exception raised for that file
+        """
+        with ThreadPoolExecutor(max_workers=max_workers or MAX_CONCURRENT_DELETES) as executor:
+            futures = [executor.submit(self.delete_file, file_id) for file_id in file_ids]
+        
+        return _collect_results(futures)
     
     def download_file_content(self, file_id):
         """
@@ -164,10 +357,135 @@ class XAIFilesAPI:
         """
         url = f"{self.base_url}/files/{file_id}/content"
         
-        response = requests.get(url, headers=self.headers)
+        response = self.session.get(url)
         response.raise_for_status()
         return response.content
     
+    def download_file_stream(self, file_id, sink, chunk_size=1 << 16):
+        """
+        Stream file content into a writable binary file object
+        
+        Unlike download_file_content, the body is never held in memory as a
+        single bytes object. The sink is rewound to the start afterwards when
+        it supports seeking.
+        
+        Args:
+            file_id: ID of the file
+            sink: Binary file-like object to write the content to
+            chunk_size: Size of the chunks read from the response
+        
+        Returns:
+            str: Text encoding declared in the response's Content-Type, or
+                 None if there is none (or it is not a known codec)
+        """
+        url = f"{self.base_url}/files/{file_id}/content"
+        
+        with self.session.get(url, stream=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                sink.write(chunk)
+            charset = _charset_from_content_type(response.headers.get("Content-Type"))
+        
+        try:
+            sink.seek(0)
+        except (AttributeError, OSError):
+            # Not seekable (e.g. a pipe); the caller already has the data
+            pass
+        return charset
+    
+    def download_many(self, file_ids, max_workers=None):
+        """
+        Download the content of several files concurrently
+        
+        Each file is streamed into a SpooledTemporaryFile, so small files stay
+        in memory while large ones spill to disk.
+        
+        Args:
+            file_ids: IDs of the files to download
+            max_workers: Maximum number of parallel downloads
+                         (default: XAI_MAX_CONCURRENT_DOWNLOADS or 8)
+        
+        Returns:
+            list: One entry per file, in the same order as file_ids: a tuple
+                  of a binary file object positioned at the start of the
+                  content (the caller should close it) and the declared text
+                  encoding (or None), or the exception raised for that file
+        """
+        def download(file_id):
+            sink = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+            try:
+                return sink, self.download_file_stream(file_id, sink)
+            except Exception:
+                sink.close()
+                raise
+        
+        with ThreadPoolExecutor(max_workers=max_workers or MAX_CONCURRENT_DOWNLOADS) as executor:
+            futures = [executor.submit(download, file_id) for file_id in file_ids]
+        
+        return _collect_results(futures)
+    
+    def _get_json_cached(self, url):
+        """
+        GET a JSON resource, revalidating any cached copy with its ETag
+        
+        If the server answers 304 Not Modified, the cached response is
+        returned without transferring or parsing the body again.
+        
+        Args:
+            url: URL of the resource
+        
+        Returns:
+            dict: Parsed JSON response
+        """
+        with self._etag_lock:
+            cached = self._etag_cache.get(url)
+        headers = {"If-None-Match": cached[0]} if cached else None
+        
+        response = self.session.get(url, headers=headers)
+        if cached and response.status_code == 304:
+            with self._etag_lock:
+                # Mark as recently used so it survives eviction
+                if url in self._etag_cache:
+                    self._etag_cache[url] = self._etag_cache.pop(url)
+            return cached[1]
+        
+        response.raise_for_status()
+        data = _parse_json(response)
+        
+        etag = response.headers.get("ETag")
+        with self._etag_lock:
+            previous = self._etag_cache.pop(url, None)
+            entry = (etag, data) if etag else None
+            if entry:
+                self._etag_cache[url] = entry
+                while len(self._etag_cache) > ETAG_CACHE_MAX_ENTRIES:
+                    del self._etag_cache[next(iter(self._etag_cache))]
+            # Only rewrite the file when the stored entry actually changed
+            if entry != previous:
+                self._save_etag_cache()
+        
+        return data
+    
+    def _load_etag_cache(self):
+        """Load the persisted ETag cache, or start empty if unavailable"""
+        try:
+            with open(self._etag_cache_path) as f:
+                return {url: tuple(entry) for url, entry in json.load(f).items()}
+        except (OSError, ValueError, AttributeError, TypeError):
+            return {}
+    
+    def _save_etag_cache(self):
+        """Persist the ETag cache so later runs can revalidate too"""
+        try:
+            self._etag_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            partial_path = self._etag_cache_path.with_suffix(".json.part")
+            with open(partial_path, 'w') as f:
+                json.dump(self._etag_cache, f)
+            os.replace(partial_path, self._etag_cache_path)
+        except OSError:
+            # Caching is best effort; a read-only home directory is fine
+            pass
+    
     def chat_with_file(self, file_ids, message, model="grok-4"):
         """
         Create a chat completion using uploaded files
@@ -193,35 +511,170 @@ class XAIFilesAPI:
             "file_ids": file_ids
         }
         
-        response = requests.post(
-            url,
-            headers={**self.headers, "Content-Type": "application/json"},
-            json=payload
-        )
+        response = self.post_json(url, payload)
         response.raise_for_status()
-        return response.json()
+        return _parse_json(response)
+    
+    def post_json(self, url, payload):
+        """
+        POST a JSON payload, encoded with orjson when available
+        
+        Args:
+            url: URL to post to
+            payload: JSON-serializable request body
+        
+        Returns:
+            requests.Response: The raw response
+        """
+        return self.session.post(url, headers=self.json_headers, data=_dump_json(payload))
+
+
+class _MappedFile:
+    """
+    Read-only memory map of a file for use as a MultipartEncoder body
+    
+    requests_toolbelt treats ``len`` as the number of bytes still to be read,
+    while len() of an mmap is always the full size, so it is exposed here.
+    """
+    
+    def __init__(self, f):
+        self._map = mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ)
+    
+    @property
+    def len(self):
+        return len(self._map) - self._map.tell()
+    
+    def read(self, size=-1):
+        return self._map.read(size)
+    
+    def close(self):
+        self._map.close()
+
+
+def _map_file(f):
+    """
+    Memory-map an open file so uploads read it straight from the page cache
+    
+    Args:
+        f: File object opened in binary read mode
+    
+    Returns:
+        A _MappedFile on Linux, otherwise (or if the file cannot be mapped)
+        the file object itself
+    """
+    if not sys.platform.startswith("linux"):
+        return f
+    try:
+        return _MappedFile(f)
+    except (OSError, ValueError):
+        # Empty files and some special files can't be mapped
+        return f
+
+
+@lru_cache(maxsize=None)
+def _charset_from_content_type(content_type):
+    """
+    Get the text encoding declared in a Content-Type header
+    
+    Args:
+        content_type: Value of the Content-Type header, e.g.
+                      "text/plain; charset=ISO-8859-1"
+    
+    Returns:
+        str: Normalized codec name (e.g. "iso8859-1"), or None if no charset
+             is declared or Python doesn't know it
+    """
+    if not content_type:
+        return None
+    
+    message = Message()
+    message["Content-Type"] = content_type
+    charset = message.get_content_charset()
+    if not charset:
+        return None
+    
+    try:
+        return codecs.lookup(charset).name
+    except LookupError:
+        return None
+
+
+def _parse_json(response):
+    """Decode a JSON response body, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
 
+def _dump_json(payload):
+    """Encode a JSON request body as bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode('utf-8')
 
-def extract_text_from_pdf(pdf_bytes):
+
+def _collect_results(futures):
+    """Return each future's result, or the exception it raised, in order"""
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+@lru_cache(maxsize=1)
+def _get_pdf_reader_class():
     """
-    Extract text from PDF bytes
+    Import the PDF library (optional) on first use
+    
+    The import is deferred because it pulls in many modules and is only
+    needed when a PDF is actually processed. pypdf, the maintained successor
+    of PyPDF2, is preferred when installed.
+    
+    Returns:
+        The PdfReader class, or None if no PDF library is installed
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        try:
+            from PyPDF2 import PdfReader
+        except ImportError:
+            return None
+    return PdfReader
+
+
+def _has_pdf_support():
+    """Check whether a PDF library is available"""
+    return _get_pdf_reader_class() is not None
+
+
+def extract_text_from_pdf(pdf_data):
+    """
+    Extract text from a PDF
     
     Args:
-        pdf_bytes: PDF file content as bytes
+        pdf_data: PDF file content as bytes or a seekable binary file object
     
     Returns:
         str: Extracted text from PDF
     """
-    if not PDF_SUPPORT:
+    PdfReader = _get_pdf_reader_class()
+    if PdfReader is None:
         raise ImportError("PyPDF2 is required for PDF support. Install with: pip install PyPDF2")
     
-    reader = PdfReader(BytesIO(pdf_bytes))
-    text = ""
-    for page_num, page in enumerate(reader.pages, 1):
-        page_text = page.extract_text()
-        text += f"\n--- Page {page_num} ---\n{page_text}\n"
+    if isinstance(pdf_data, (bytes, bytearray)):
+        pdf_data = BytesIO(pdf_data)
+    reader = PdfReader(pdf_data)
     
-    return text
+    # Collect the pages and join once; repeated += is quadratic on long PDFs.
+    # Pages are extracted serially because they all read from the same stream.
+    return "".join(
+        f"\n--- Page {page_num} ---\n{page.extract_text()}\n"
+        for page_num, page in enumerate(reader.pages, 1)
+    )
 
 
 def get_files_from_path(path):
@@ -239,11 +692,13 @@ def get_files_from_path(path):
     if path_obj.is_file():
         return [path]
     elif path_obj.is_dir():
-        # Get all files in directory (non-recursive)
-        files = []
-        for item in path_obj.iterdir():
-            if item.is_file() and not item.name.startswith('.'):
-                files.append(str(item))
+        # Get all files in directory (non-recursive). scandir's entries
+        # know their type from the directory listing, avoiding a stat per file.
+        with os.scandir(path_obj) as entries:
+            files = [
+                entry.path for entry in entries
+                if entry.name[0] != '.' and entry.is_file()
+            ]
         return sorted(files)
     else:
         return []
@@ -251,9 +706,7 @@ def get_files_from_path(path):
 
 def print_section(title):
     """Print a formatted section header"""
-    print("\n" + "=" * 60)
-    print(f"  {title}")
-    print("=" * 60)
+    sys.stdout.write(f"\n{SEP}\n  {title}\n{SEP}\n")
 
 
 def demo():
@@ -261,221 +714,245 @@ def demo():
     
     print_section("X.AI Files API Demo")
     
+    # Optional flag, the remaining arguments are the path and the prompt
+    delete_all = '--delete-all' in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg != '--delete-all']
+    
+    # Temporary directory holding the sample file, if one is created
+    sample_dir = None
+    
     try:
         # Initialize the API client
-        api = XAIFilesAPI()
-        print("✓ API client initialized successfully")
-        
-        # Check if a path was provided as command-line argument
-        custom_prompt = None
-        if len(sys.argv) > 1:
-            input_path = sys.argv[1]
-            if not os.path.exists(input_path):
-                print(f"❌ Error: Path not found: {input_path}", file=sys.stderr)
-                sys.exit(1)
+        with XAIFilesAPI() as api:
+            print("✓ API client initialized successfully")
             
-            # Check if custom prompt was provided
-            if len(sys.argv) > 2:
-                custom_prompt = sys.argv[2]
-                print(f"✓ Custom prompt: \"{custom_prompt}\"")
+            # Check if a path was provided as command-line argument
+            custom_prompt = None
+            if args:
+                input_path = args[0]
+                if not os.path.exists(input_path):
+                    print(f"❌ Error: Path not found: {input_path}", file=sys.stderr)
+                    sys.exit(1)
+                
+                # Check if custom prompt was provided
+                if len(args) > 1:
+                    custom_prompt = args[1]
+                    print(f"✓ Custom prompt: \"{custom_prompt}\"")
+                
+                # Get files from path (file or directory)
+                files_to_upload = get_files_from_path(input_path)
+                
+                if not files_to_upload:
+                    print(f"❌ Error: No files found in: {input_path}", file=sys.stderr)
+                    sys.exit(1)
+                
+                if len(files_to_upload) == 1:
+                    print(f"✓ Using provided file: {files_to_upload[0]}")
+                else:
+                    print(f"✓ Found {len(files_to_upload)} files in directory: {input_path}")
+                    for f in files_to_upload:
+                        print(f"  - {Path(f).name}")
+            else:
+                # Create a sample file to upload in a temporary directory,
+                # keeping the current directory clean
+                sample_dir = tempfile.mkdtemp(prefix="xai-files-demo-")
+                sample_file = os.path.join(sample_dir, "sample_data.txt")
+                fd = os.open(sample_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                try:
+                    os.write(fd, SAMPLE_BYTES)
+                finally:
+                    os.close(fd)
+                print(f"✓ Created sample file: {sample_file}")
+                files_to_upload = [sample_file]
             
-            # Get files from path (file or directory)
-            files_to_upload = get_files_from_path(input_path)
+            # 1. Upload file(s)
+            print_section(f"1. Upload File{'s' if len(files_to_upload) > 1 else ''}")
+            uploaded_files = []
+            
+            upload_results = api.upload_files(files_to_upload, purpose="assistants")
+            
+            lines = []
+            for file_path, upload_response in zip(files_to_upload, upload_results):
+                if isinstance(upload_response, Exception):
+                    lines.append(f"✗ Failed to upload {Path(file_path).name}: {str(upload_response)}\n")
+                    continue
+                
+                uploaded_files.append(upload_response)
+                lines.append(
+                    f"✓ Uploaded: {Path(file_path).name}\n"
+                    f"  File ID: {upload_response.get('id')}\n"
+                    f"  Bytes: {upload_response.get('bytes')}\n"
+                )
+            sys.stdout.write("".join(lines))
             
-            if not files_to_upload:
-                print(f"❌ Error: No files found in: {input_path}", file=sys.stderr)
+            if not uploaded_files:
+                print("❌ No files were uploaded successfully")
                 sys.exit(1)
             
-            if len(files_to_upload) == 1:
-                print(f"✓ Using provided file: {files_to_upload[0]}")
-            else:
-                print(f"✓ Found {len(files_to_upload)} files in directory: {input_path}")
-                for f in files_to_upload:
-                    print(f"  - {Path(f).name}")
+            # Use the first uploaded file for demo purposes
+            file_id = uploaded_files[0].get('id')
+            print(f"\n✓ Total files uploaded: {len(uploaded_files)}")
             
-            cleanup_files = False  # Don't delete user's files
-        else:
-            # Create a sample file to upload
-            sample_file = "sample_data.txt"
-            with open(sample_file, 'w') as f:
-                f.write("""Sample Data for X.AI Files API Demo
+            # 2. List all files
+            print_section("2. List All Files")
+            list_response = api.list_files()
+            print(f"✓ Retrieved {len(list_response.get('data', []))} file(s)")
+            sys.stdout.write("".join(
+                f"  {idx}. {file.get('filename')} (ID: {file.get('id')})\n"
+                for idx, file in enumerate(list_response.get('data', []), 1)
+            ))
             
-This is a sample text file containing information that can be used
-by the AI model during conversations.
-
-Key Facts:
-- The X.AI Files API allows uploading documents for context
-- Supported purposes include 'assistants' and 'fine-tune'
-- Files can be listed, retrieved, and deleted via the API
-- Files can be referenced in chat completions
-
-Example Use Cases:
-1. Providing context documents for specialized knowledge
-2. Uploading training data for fine-tuning
-3. Storing reference materials for long-term conversations
-""")
-            print(f"✓ Created sample file: {sample_file}")
-            files_to_upload = [sample_file]
-            cleanup_files = True  # Clean up our created file
-        
-        # 1. Upload file(s)
-        print_section(f"1. Upload File{'s' if len(files_to_upload) > 1 else ''}")
-        uploaded_files = []
-        
-        for file_path in files_to_upload:
-            try:
-                upload_response = api.upload_file(file_path, purpose="assistants")
-                uploaded_files.append(upload_response)
-                print(f"✓ Uploaded: {Path(file_path).name}")
-                print(f"  File ID: {upload_response.get('id')}")
-                print(f"  Bytes: {upload_response.get('bytes')}")
-            except Exception as e:
-                print(f"✗ Failed to upload {Path(file_path).name}: {str(e)}")
-        
-        if not uploaded_files:
-            print("❌ No files were uploaded successfully")
-            sys.exit(1)
-        
-        # Use the first uploaded file for demo purposes
-        file_id = uploaded_files[0].get('id')
-        print(f"\n✓ Total files uploaded: {len(uploaded_files)}")
-        
-        # 2. List all files
-        print_section("2. List All Files")
-        list_response = api.list_files()
-        print(f"✓ Retrieved {len(list_response.get('data', []))} file(s)")
-        for idx, file in enumerate(list_response.get('data', []), 1):
-            print(f"  {idx}. {file.get('filename')} (ID: {file.get('id')})")
-        
-        # 3. Get specific file information
-        print_section("3. Get File Information")
-        file_info = api.get_file(file_id)
-        print(f"✓ Retrieved file information:")
-        print(json.dumps(file_info, indent=2))
-        
-        # 4. Use file content in chat completion
-        print_section("4. Chat with File Content")
-        print("Note: The file_ids parameter may not be supported yet.")
-        print("Alternative: Download file content and include it in the chat.\n")
-        
-        try:
-            # Download and process content from ALL uploaded files
-            all_files_text = ""
+            # 3. Get specific file information
+            print_section("3. Get File Information")
+            file_info = api.get_file(file_id)
+            print(f"✓ Retrieved file information:")
+            print(json.dumps(file_info, indent=2))
             
-            for idx, uploaded_file in enumerate(uploaded_files, 1):
-                file_id_current = uploaded_file.get('id')
-                filename = uploaded_file.get('filename', '')
+            # 4. Use file content in chat completion
+            print_section("4. Chat with File Content")
+            print("Note: The file_ids parameter may not be supported yet.")
+            print("Alternative: Download file content and include it in the chat.\n")
+            
+            try:
+                # Download and process content from ALL uploaded files
+                all_files_parts = []
+                remaining_chars = MAX_CONTEXT_CHARS
                 
-                print(f"Downloading file {idx}/{len(uploaded_files)}: {filename}...")
-                file_content = api.download_file_content(file_id_current)
+                # Fetch all files in parallel, then extract their text one by one
+                print(f"Downloading {len(uploaded_files)} file(s)...")
+                file_contents = api.download_many([f.get('id') for f in uploaded_files])
                 
-                # Check if it's a PDF file
-                if filename.lower().endswith('.pdf'):
-                    if not PDF_SUPPORT:
-                        print(f"⚠ PDF file detected but PyPDF2 not installed: {filename}")
-                        print("  Install with: pip install PyPDF2")
+                for uploaded_file, file_content in zip(uploaded_files, file_contents):
+                    filename = uploaded_file.get('filename', '')
+                    
+                    if isinstance(file_content, Exception):
+                        print(f"✗ Failed to download {filename}: {str(file_content)}")
                         continue
                     
-                    print(f"📄 PDF detected - extracting text from {filename}...")
-                    file_text = extract_text_from_pdf(file_content)
-                    print(f"✓ Extracted {len(file_text)} characters from {filename}")
-                else:
-                    # Try to decode as UTF-8 text
-                    try:
-                        file_text = file_content.decode('utf-8')
-                        print(f"✓ Loaded {len(file_text)} characters from {filename}")
-                    except UnicodeDecodeError:
-                        print(f"⚠ Unable to decode {filename} as text. Skipping.")
+                    file_content, charset = file_content
+                    with file_content:
+                        # Check if it's a PDF file
+                        if filename.lower().endswith('.pdf'):
+                            if not _has_pdf_support():
+                                print(f"⚠ PDF file detected but PyPDF2 not installed: {filename}")
+                                print("  Install with: pip install PyPDF2")
+                                continue
+                            
+                            print(f"📄 PDF detected - extracting text from {filename}...")
+                            file_text = extract_text_from_pdf(file_content)
+                            print(f"✓ Extracted {len(file_text)} characters from {filename}")
+                        else:
+                            # Decode using the server's declared charset, replacing
+                            # any invalid bytes. Without one, only valid UTF-8 is
+                            # treated as text so binary files are still skipped
+                            try:
+                                if charset:
+                                    file_text = file_content.read().decode(charset, errors='replace')
+                                else:
+                                    file_text = file_content.read().decode('utf-8')
+                                print(f"✓ Loaded {len(file_text)} characters from {filename}")
+                            except UnicodeDecodeError:
+                                print(f"⚠ Unable to decode {filename} as text. Skipping.")
+                                continue
+                    
+                    # Stay within the context limit rather than having the
+                    # whole request rejected
+                    if remaining_chars <= 0:
+                        print(f"⚠ Context limit of {MAX_CONTEXT_CHARS} characters reached. Skipping {filename}.")
                         continue
+                    if len(file_text) > remaining_chars:
+                        print(f"⚠ Truncating {filename} to {remaining_chars} characters to fit the context limit")
+                        file_text = file_text[:remaining_chars]
+                    remaining_chars -= len(file_text)
+                    
+                    # Add file content with header
+                    all_files_parts.append(f"\n{SEP}\nFILE: {filename}\n{SEP}\n")
+                    all_files_parts.append(file_text)
+                    all_files_parts.append("\n\n")
                 
-                # Add file content with header
-                all_files_text += f"\n{'='*60}\n"
-                all_files_text += f"FILE: {filename}\n"
-                all_files_text += f"{'='*60}\n"
-                all_files_text += file_text
-                all_files_text += f"\n\n"
-            
-            if not all_files_text:
-                print("⚠ No readable content extracted from files.")
-                raise Exception("No files could be processed for chat")
-            
-            file_text = all_files_text
-            print(f"\n✓ Total content: {len(file_text)} characters from {len(uploaded_files)} file(s)")
+                if not all_files_parts:
+                    print("⚠ No readable content extracted from files.")
+                    raise Exception("No files could be processed for chat")
+                
+                file_text = "".join(all_files_parts)
+                print(f"\n✓ Total content: {len(file_text)} characters from {len(uploaded_files)} file(s)")
+                
+                # Create a chat completion with the file content in the message
+                if len(uploaded_files) == 1:
+                    question = custom_prompt if custom_prompt else "What are the key facts mentioned in this file?"
+                    context_intro = "Here is the content of a file:"
+                else:
+                    question = custom_prompt if custom_prompt else f"What are the key facts mentioned in these {len(uploaded_files)} files?"
+                    context_intro = f"Here is the content of {len(uploaded_files)} files:"
+                
+                url = f"{api.base_url}/chat/completions"
+                payload = {
+                    "model": "grok-4",
+                    "messages": [
+                        {
+                            "role": "system",
+                            "content": "You are a helpful assistant. Answer questions about the provided file content."
+                        },
+                        {
+                            "role": "user",
+                            "content": f"{context_intro}\n\n{file_text}\n\nQuestion: {question}"
+                        }
+                    ]
+                }
+                
+                response = api.post_json(url, payload)
+                response.raise_for_status()
+                chat_response = _parse_json(response)
+                
+                # Extract the assistant's response
+                if chat_response.get('choices') and len(chat_response['choices']) > 0:
+                    assistant_message = chat_response['choices'][0]['message']['content']
+                    print("✓ Grok's Response:")
+                    print("-" * 60)
+                    print(assistant_message)
+                    print("-" * 60)
+                    print(f"\nModel: {chat_response.get('model')}")
+                    print(f"Usage: {chat_response.get('usage', {}).get('total_tokens', 'N/A')} tokens")
+                else:
+                    print("⚠ No response content received")
+                    print(f"Full response: {json.dumps(chat_response, indent=2)}")
+                    
+            except Exception as e:
+                print(f"⚠ Chat with file content failed: {str(e)}")
+                if getattr(e, 'response', None) is not None:
+                    print(f"Response: {e.response.text}")
             
-            # Create a chat completion with the file content in the message
-            if len(uploaded_files) == 1:
-                question = custom_prompt if custom_prompt else "What are the key facts mentioned in this file?"
-                context_intro = "Here is the content of a file:"
+            # 5. Delete the file (optional - uncomment to test)
+            print_section("5. Delete File (Optional)")
+            if delete_all:
+                file_ids = [f.get('id') for f in uploaded_files]
+                delete_results = api.delete_many(file_ids)
+                for deleted_id, delete_response in zip(file_ids, delete_results):
+                    if isinstance(delete_response, Exception):
+                        print(f"✗ Failed to delete {deleted_id}: {str(delete_response)}")
+                    else:
+                        print(f"✓ Deleted: {deleted_id}")
+            elif input("Do you want to delete the uploaded file? (y/n): ").strip().lower() == 'y':
+                delete_response = api.delete_file(file_id)
+                print(f"✓ File deleted successfully!")
+                print(json.dumps(delete_response, indent=2))
             else:
-                question = custom_prompt if custom_prompt else f"What are the key facts mentioned in these {len(uploaded_files)} files?"
-                context_intro = f"Here is the content of {len(uploaded_files)} files:"
+                print(f"✓ File retained. ID: {file_id}")
             
-            url = f"{api.base_url}/chat/completions"
-            payload = {
-                "model": "grok-4",
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": "You are a helpful assistant. Answer questions about the provided file content."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"{context_intro}\n\n{file_text}\n\nQuestion: {question}"
-                    }
-                ]
-            }
-            
-            response = requests.post(
-                url,
-                headers={**api.headers, "Content-Type": "application/json"},
-                json=payload
-            )
-            response.raise_for_status()
-            chat_response = response.json()
+            print_section("Demo Complete")
+            print("✓ All operations completed successfully!")
             
-            # Extract the assistant's response
-            if chat_response.get('choices') and len(chat_response['choices']) > 0:
-                assistant_message = chat_response['choices'][0]['message']['content']
-                print("✓ Grok's Response:")
-                print("-" * 60)
-                print(assistant_message)
-                print("-" * 60)
-                print(f"\nModel: {chat_response.get('model')}")
-                print(f"Usage: {chat_response.get('usage', {}).get('total_tokens', 'N/A')} tokens")
-            else:
-                print("⚠ No response content received")
-                print(f"Full response: {json.dumps(chat_response, indent=2)}")
-                
-        except Exception as e:
-            print(f"⚠ Chat with file content failed: {str(e)}")
-            if hasattr(e, 'response'):
-                print(f"Response: {e.response.text}")
-        
-        # 5. Delete the file (optional - uncomment to test)
-        print_section("5. Delete File (Optional)")
-        delete_choice = input("Do you want to delete the uploaded file? (y/n): ").strip().lower()
-        if delete_choice == 'y':
-            delete_response = api.delete_file(file_id)
-            print(f"✓ File deleted successfully!")
-            print(json.dumps(delete_response, indent=2))
-        else:
-            print(f"✓ File retained. ID: {file_id}")
-        
-        # Clean up local sample files (only if we created them)
-        if cleanup_files:
-            for file_path in files_to_upload:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-            print(f"\n✓ Cleaned up local sample file(s)")
-        
-        print_section("Demo Complete")
-        print("✓ All operations completed successfully!")
-        
     except Exception as e:
         print(f"\n❌ Error: {str(e)}", file=sys.stderr)
-        if hasattr(e, 'response'):
+        if getattr(e, 'response', None) is not None:
             print(f"Response: {e.response.text}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        # Clean up the local sample file (only if we created it), also when
+        # the demo exits early or fails
+        if sample_dir:
+            shutil.rmtree(sample_dir, ignore_errors=True)
+            print(f"\n✓ Cleaned up local sample file(s)")
 
 
 if __name__ == "__main__":